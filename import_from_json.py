@@ -1,15 +1,42 @@
 #!/usr/bin/env python3
 
+import io
 import os
 import json
-from sqlalchemy import create_engine, text
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from sqlalchemy import create_engine
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 
+try:
+    import ijson
+    USE_IJSON = True
+except ImportError:
+    USE_IJSON = False
+
+try:
+    import orjson
+    USE_ORJSON = True
+except ImportError:
+    USE_ORJSON = False
+
+try:
+    import ciso8601
+    USE_CISO8601 = True
+except ImportError:
+    USE_CISO8601 = False
+
 # Same symbol/timeframes
 SYMBOLS = ["es", "eurusd", "spy"]
 TIMEFRAMES = ["1m", "5m", "15m", "30m", "1h", "4h", "1d"]
 
+# Tables are imported in parallel worker processes (each with its own DB connection);
+# keep this well under the server's max_connections.
+MAX_IMPORT_WORKERS = 4
+
+# NULL marker in COPY text format
+COPY_NULL = "\\N"
+
 def main():
     """
     1. Connect to the DB that already has empty 'backtest' and 'fronttest' tables (restored from .dump).
@@ -19,69 +46,110 @@ def main():
 
     load_dotenv("../config/.env")  # or adjust if needed
     DB_URL = os.getenv("DB_URL") or "postgresql://postgres@localhost:5432/trading_data"
-    engine = create_engine(DB_URL)
 
-    # 1) Import backtest_data.json
-    try:
-        with open("backtest_data.json", "r", encoding="utf-8") as f:
-            backtest_json = json.load(f)
-    except FileNotFoundError:
-        print("[ERROR] Could not find backtest_data.json. Exiting.")
-        return
+    # Each worker process opens one connection for the whole run (see init_worker);
+    # every table is its own transaction on it.
+    with ProcessPoolExecutor(max_workers=MAX_IMPORT_WORKERS,
+                             initializer=init_worker, initargs=(DB_URL,)) as executor:
+        # 1) Import backtest_data.json
+        print()
+        if not import_json_file(executor, "backtest_data.json", "backtest"):
+            return
+        print("\n[INFO] Finished loading backtest_data.json.\n")
+
+        # 2) Import fronttest_data.json
+        if not import_json_file(executor, "fronttest_data.json", "fronttest"):
+            return
+        print("\n[INFO] Finished loading fronttest_data.json.\n")
 
-    print("\n[IMPORT] Now inserting rows into backtest tables...\n")
-    for table_info in backtest_json["tables"]:
-        table_short_name = table_info["table"]  # e.g. "es_1m"
-        rows = table_info["rows"]
-        full_table_name = f"backtest.{table_short_name}"
 
-        if not rows:
-            print(f"  [INFO] {full_table_name} has no rows in JSON. Skipping.")
-            continue
+# Per-process DB connection, set up by init_worker
+worker_conn = None
 
-        print(f"  [IMPORT] Inserting {len(rows)} rows into {full_table_name} ...")
-        insert_rows(engine, full_table_name, rows)
+def init_worker(db_url):
+    """ProcessPoolExecutor initializer: each worker gets its own engine + connection."""
+    global worker_conn
+    worker_conn = create_engine(db_url).connect()
 
-    print("\n[INFO] Finished loading backtest_data.json.\n")
 
-    # 2) Import fronttest_data.json
+def import_table(full_table_name, rows):
+    """Worker entry point: insert_rows on this process's connection."""
+    insert_rows(worker_conn, full_table_name, rows)
+
+
+def import_json_file(executor, json_path, schema):
+    """
+    Insert every table found in json_path into <schema>.<table>.
+    Tables are parsed one at a time (see iter_tables) and handed to the worker
+    pool as they come; at most MAX_IMPORT_WORKERS tables are queued, so the
+    whole dump is never held in memory at once.
+    Returns False if the file doesn't exist; waits until every table is done.
+    """
     try:
-        with open("fronttest_data.json", "r", encoding="utf-8") as f:
-            fronttest_json = json.load(f)
+        f = open(json_path, "rb")
     except FileNotFoundError:
-        print("[ERROR] Could not find fronttest_data.json. Exiting.")
-        return
+        print(f"[ERROR] Could not find {json_path}. Exiting.")
+        return False
 
-    print("[IMPORT] Now inserting rows into fronttest tables...\n")
-    for table_info in fronttest_json["tables"]:
-        table_short_name = table_info["table"]
-        rows = table_info["rows"]
-        full_table_name = f"fronttest.{table_short_name}"
+    pending = set()
+    with f:
+        print(f"[IMPORT] Now inserting rows into {schema} tables...\n")
+        for table_info in iter_tables(f):
+            table_short_name = table_info["table"]  # e.g. "es_1m"
+            rows = table_info["rows"]
+            full_table_name = f"{schema}.{table_short_name}"
 
-        if not rows:
-            print(f"  [INFO] {full_table_name} has no rows in JSON. Skipping.")
-            continue
+            if not rows:
+                print(f"  [INFO] {full_table_name} has no rows in JSON. Skipping.")
+                continue
 
-        print(f"  [IMPORT] Inserting {len(rows)} rows into {full_table_name} ...")
-        insert_rows(engine, full_table_name, rows)
+            if len(pending) >= MAX_IMPORT_WORKERS:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    fut.result()  # re-raise worker errors
 
-    print("\n[INFO] Finished loading fronttest_data.json.\n")
+            print(f"  [IMPORT] Inserting {len(rows)} rows into {full_table_name} ...")
+            pending.add(executor.submit(import_table, full_table_name, rows))
+
+    for fut in pending:
+        fut.result()
+    return True
+
+
+def iter_tables(f):
+    """
+    Yield each {"table": ..., "rows": [...]} entry of a dump file.
+    With ijson the entries are parsed lazily, one table at a time; otherwise
+    fall back to loading the whole document (with orjson if installed, which
+    parses several times faster than the stdlib json module).
+    """
+    if USE_IJSON:
+        # use_float: ijson yields Decimal for JSON numbers by default
+        yield from ijson.items(f, "tables.item", use_float=True)
+    elif USE_ORJSON:
+        yield from orjson.loads(f.read())["tables"]
+    else:
+        yield from json.load(f)["tables"]
 
 
-def insert_rows(engine, full_table_name, rows):
+def insert_rows(conn, full_table_name, rows):
     """
-    Insert each row into e.g. "backtest.es_1m", ignoring duplicates if already present.
-    We'll do an upsert:
-        ON CONFLICT (symbol, timestamp) DO UPDATE ...
+    Insert rows into e.g. "backtest.es_1m", updating duplicates if already present.
+
+    The rows are streamed with COPY (text format) into a temp staging table, then merged
+    into the target with a single statement:
+        INSERT ... SELECT ... ON CONFLICT (symbol, timestamp) DO UPDATE ...
     because your tables likely have PRIMARY KEY(symbol, timestamp).
 
-    If the table is truly empty, it just inserts everything.
+    Timestamps are sent as the raw ISO strings from the JSON and parsed by
+    Postgres (in UTC, like parse_timestamp) into the timestamptz staging column;
+    the INSERT ... SELECT casts into whatever types the target table uses.
     """
-    upsert_sql = text(f"""
+    merge_sql = f"""
         INSERT INTO {full_table_name}
             (symbol, timestamp, open, high, low, close, volume, candle_color)
-        VALUES
-            (:symbol, :timestamp, :open, :high, :low, :close, :volume, :candle_color)
+        SELECT symbol, timestamp, open, high, low, close, volume, candle_color
+          FROM stg
         ON CONFLICT (symbol, timestamp) DO UPDATE
             SET open         = EXCLUDED.open,
                 high         = EXCLUDED.high,
@@ -89,33 +157,85 @@ def insert_rows(engine, full_table_name, rows):
                 close        = EXCLUDED.close,
                 volume       = EXCLUDED.volume,
                 candle_color = EXCLUDED.candle_color
-    """)
-
-    with engine.begin() as conn:
-        count = 0
-        for r in rows:
-            symbol = r["symbol"]
-            # parse timestamp from ISO8601
-            dt = parse_timestamp(r["timestamp"])
-            o = r["open"]
-            h = r["high"]
-            l = r["low"]
-            c = r["close"]
-            v = r["volume"]
-            color = r["candle_color"]
-
-            conn.execute(upsert_sql, {
-                "symbol": symbol,
-                "timestamp": dt,
-                "open": o,
-                "high": h,
-                "low": l,
-                "close": c,
-                "volume": v,
-                "candle_color": color
-            })
-            count += 1
-        print(f"    [DONE] Inserted/Updated {count} rows in {full_table_name}.")
+    """
+
+    with conn.begin():
+        cur = conn.connection.cursor()
+        # parse_timestamp reads offset-less strings as UTC; make Postgres read the
+        # raw strings in the COPY (and naive timestamps) the same way, whatever the
+        # server's TimeZone setting is.
+        cur.execute("SET LOCAL TimeZone = 'UTC'")
+
+        # Only send rows newer than what the table already has, so re-running the
+        # import against a partially-loaded DB transfers just the tail.
+        # Each timestamp is parsed once; the parsed instant drives both the
+        # MAX filter and the dedup below.
+        parsed = [(parse_timestamp(r["timestamp"]), r) for r in rows]
+        cur.execute(f"SELECT MAX(timestamp) FROM {full_table_name}")
+        max_ts = cur.fetchone()[0]
+        if max_ts:
+            if not max_ts.tzinfo:
+                max_ts = max_ts.replace(tzinfo=timezone.utc)
+            parsed = [(dt, r) for dt, r in parsed if dt > max_ts]
+            if not parsed:
+                cur.close()
+                print(f"    [SKIP] {full_table_name} already has every row (latest {max_ts}).")
+                return
+
+        # Keep only the last row per (symbol, instant): a key repeated within one
+        # INSERT ... ON CONFLICT DO UPDATE makes Postgres abort the whole statement.
+        # Keyed on the parsed datetime, so '...Z' and '...+00:00' (or any two
+        # offsets for the same instant) count as the same key.
+        dedup = {}
+        for dt, r in parsed:
+            dedup[(r["symbol"], dt)] = r
+        rows = list(dedup.values())
+
+        buf = build_copy_buffer(rows)
+
+        cur.execute("""
+            CREATE TEMP TABLE stg (
+                symbol       text,
+                timestamp    timestamptz,
+                open         float8,
+                high         float8,
+                low          float8,
+                close        float8,
+                volume       bigint,
+                candle_color text
+            ) ON COMMIT DROP
+        """)
+        cur.copy_expert(
+            "COPY stg (symbol, timestamp, open, high, low, close, volume, candle_color) "
+            "FROM STDIN WITH (FORMAT text)",
+            buf,
+        )
+        cur.execute(merge_sql)
+        cur.close()
+        print(f"    [DONE] Inserted/Updated {len(rows)} rows in {full_table_name}.")
+
+
+def build_copy_buffer(rows):
+    """
+    Encode rows as COPY text lines matching the staging table:
+    (symbol, timestamp, open, high, low, close, volume, candle_color).
+    """
+    lines = [
+        f"{r['symbol']}\t{r['timestamp']}\t{copy_field(r['open'])}\t{copy_field(r['high'])}\t"
+        f"{copy_field(r['low'])}\t{copy_field(r['close'])}\t{copy_volume(r['volume'])}\t"
+        f"{copy_field(r['candle_color'])}\n"
+        for r in rows
+    ]
+    return io.StringIO("".join(lines))
+
+
+def copy_field(value):
+    return COPY_NULL if value is None else str(value)
+
+
+def copy_volume(value):
+    # volume may come back from JSON as e.g. 1200.0; the bigint column wants 1200
+    return COPY_NULL if value is None else str(int(value))
 
 
 def parse_timestamp(ts_str):
@@ -124,8 +244,16 @@ def parse_timestamp(ts_str):
     We'll let python parse it automatically. If your DB specifically needs naive UTC or 
     some other format, adjust accordingly.
     """
-    # For standard library, we can do:
-    return datetime.fromisoformat(ts_str)
+    if USE_CISO8601:
+        # C parser, much faster than fromisoformat on tz-aware strings
+        dt = ciso8601.parse_datetime(ts_str)
+    else:
+        # For standard library, we can do:
+        dt = datetime.fromisoformat(ts_str)
+    # Offset-less strings are UTC, so they compare cleanly with timestamptz values
+    if not dt.tzinfo:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
 
 if __name__ == "__main__":
     main()
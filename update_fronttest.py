@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 
+import importlib.util
+import io
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
+import numpy as np
+import pandas as pd
+import yfinance as yf
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 
@@ -11,6 +17,10 @@ try:
 except ImportError:
     USE_TABULATE = False
 
+# pyarrow is the parquet engine for the yfinance history cache; only probe for
+# it here, pandas imports it when the cache is actually read/written
+USE_PARQUET_CACHE = importlib.util.find_spec("pyarrow") is not None
+
 ##############################################################################
 # 1) CONFIG
 ##############################################################################
@@ -29,6 +39,22 @@ YFINANCE_SYMBOLS = {
     "spy":    "SPY",
 }
 
+# Raw yfinance history per table is cached here as <symbol>_<timeframe>.parquet
+CACHE_DIR = "cache"
+
+# Longest lookback (days) Yahoo serves per intraday interval; daily is unlimited
+YF_INTERVAL_MAX_DAYS = {"1m": 7, "5m": 60, "15m": 60, "30m": 60, "60m": 730}
+
+# yfinance periods usable for a cache delta, with the (minimum) days each spans
+YF_DELTA_PERIODS = [("5d", 5), ("1mo", 28), ("3mo", 89), ("6mo", 181), ("1y", 365), ("2y", 730)]
+
+# Threads for the status-check DB probes (one probe per timeframe; within the
+# engine's default pool_size + max_overflow of 15 connections)
+STATUS_CHECK_WORKERS = len(TIMEFRAMES)
+
+# Column layout of candle DataFrames (everything but symbol, which is per table)
+CANDLE_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume", "candle_color"]
+
 CANDLE_MATCH_THRESHOLDS = {
     "es":     0.25,
     "eurusd": 0.0005,
@@ -38,13 +64,9 @@ CANDLE_MATCH_THRESHOLDS = {
 ##############################################################################
 # 2) HELPER FUNCTIONS
 ##############################################################################
-def compute_candle_color(o, c):
-    if c > o:
-        return "green"
-    elif c < o:
-        return "red"
-    else:
-        return "doji"
+def compute_candle_colors(o, c):
+    """Vectorized candle color for numpy arrays of opens/closes: green/red/doji."""
+    return np.select([c > o, c < o], ["green", "red"], default="doji")
 
 def is_close_enough(val1, val2, threshold):
     return abs(val1 - val2) <= threshold
@@ -64,86 +86,122 @@ def adjust_daily_timestamp(symbol, orig_dt):
         return datetime(orig_dt.year, orig_dt.month, orig_dt.day, 0, 0, 0, tzinfo=timezone.utc)
 
 ##############################################################################
-# 3) FETCH THE LATEST YFINANCE CANDLE (FOR "UP TO DATE?" CHECK)
+# 3) FETCH THE LATEST YFINANCE CANDLES (FOR "UP TO DATE?" CHECK)
 ##############################################################################
-def fetch_latest_yf_candle(symbol, timeframe):
+def fetch_latest_yf_candles(timeframe):
     """
-    Pull a short period from yfinance to get the newest candle for comparison.
-    Returns {timestamp, open, high, low, close, volume} or None if error/empty.
+    Pull a short period from yfinance for all SYMBOLS in one batched download
+    to get each symbol's newest candle for comparison.
+    Returns {symbol: {timestamp, open, high, low, close, volume}};
+    symbols with no data are left out (empty dict on error).
     """
-    import yfinance as yf
-    yf_symbol = YFINANCE_SYMBOLS[symbol]
     yf_interval = map_tf_to_yf_interval(timeframe)
+    yf_tickers = [YFINANCE_SYMBOLS[sym] for sym in SYMBOLS]
 
     # For daily => 1mo, else 5d
     period = "1mo" if timeframe == "1d" else "5d"
 
-    ticker = yf.Ticker(yf_symbol)
     try:
-        hist = ticker.history(period=period, interval=yf_interval)
+        # auto_adjust=True to match Ticker.history()'s default; ignore_tz=False so
+        # daily bars keep the exchange tz (like Ticker.history()) instead of being
+        # stamped as exchange-local dates, which shifts e.g. EURUSD=X by a day in BST
+        df = yf.download(yf_tickers, period=period, interval=yf_interval,
+                         group_by="ticker", threads=True, auto_adjust=True,
+                         ignore_tz=False, progress=False)
     except Exception as e:
-        print(f"[ERROR] fetch_latest_yf_candle: {symbol} {timeframe} => {e}")
-        return None
+        print(f"[ERROR] fetch_latest_yf_candles: {timeframe} => {e}")
+        return {}
 
-    if hist.empty:
-        return None
+    if df.empty:
+        return {}
 
     # Convert to UTC
-    if hist.index.tz is None:
-        hist.index = hist.index.tz_localize(timezone.utc)
+    if df.index.tz is None:
+        df.index = df.index.tz_localize(timezone.utc)
     else:
-        hist.index = hist.index.tz_convert(timezone.utc)
+        df.index = df.index.tz_convert(timezone.utc)
 
-    last_dt = hist.index[-1]
-    row = hist.iloc[-1]
+    candles = {}
+    for symbol in SYMBOLS:
+        yf_symbol = YFINANCE_SYMBOLS[symbol]
+        if yf_symbol not in df.columns.get_level_values(0):
+            continue
+        # The batched frame is the union of all tickers' timestamps => drop the
+        # all-NaN rows where this ticker had no bar.
+        hist = df[yf_symbol].dropna(how="all")
+        if hist.empty:
+            continue
 
-    # Adjust daily
-    if timeframe == "1d":
-        last_dt = adjust_daily_timestamp(symbol, last_dt)
-    # If eurusd & 5m => shift +5h if consistent with your data logic
-    if symbol == "eurusd" and timeframe == "5m":
-        last_dt = last_dt + timedelta(hours=5)
+        last_dt = hist.index[-1]
+        row = hist.iloc[-1]
+        vol = row["Volume"]
 
-    return {
-        "timestamp": last_dt,
-        "open":   float(row["Open"]),
-        "high":   float(row["High"]),
-        "low":    float(row["Low"]),
-        "close":  float(row["Close"]),
-        "volume": int(row["Volume"]) if not row.isna().Volume else 0,
-    }
+        # Adjust daily
+        if timeframe == "1d":
+            last_dt = adjust_daily_timestamp(symbol, last_dt)
+        # If eurusd & 5m => shift +5h if consistent with your data logic
+        if symbol == "eurusd" and timeframe == "5m":
+            last_dt = last_dt + timedelta(hours=5)
+
+        candles[symbol] = {
+            "timestamp": last_dt,
+            "open":   float(row["Open"]),
+            "high":   float(row["High"]),
+            "low":    float(row["Low"]),
+            "close":  float(row["Close"]),
+            "volume": 0 if pd.isna(vol) else int(vol),
+        }
+    return candles
 
 ##############################################################################
 # 4) GET THE LATEST FRONTTEST DB TIMESTAMP
 ##############################################################################
-def get_fronttest_latest_ts(symbol, timeframe):
-    table_name = f"{SCHEMA_NAME}.{symbol}_{timeframe}"
-    sql = text(f"SELECT MAX(timestamp) AS max_ts FROM {table_name}")
-    with engine.begin() as conn:
-        row = conn.execute(sql).fetchone()
-    max_ts = row.max_ts if row else None
-    if not max_ts:
-        return None
-    if not max_ts.tzinfo:
-        max_ts = max_ts.replace(tzinfo=timezone.utc)
-    else:
-        max_ts = max_ts.astimezone(timezone.utc)
-    return max_ts
+# Per-table SQL is built once at import time (not per call).
+# Latest timestamps are fetched for all symbols of a timeframe in one round trip.
+LATEST_TS_SQL = {
+    tf: text("\nUNION ALL\n".join(
+        f"SELECT '{sym}' AS symbol, MAX(timestamp) AS max_ts FROM {SCHEMA_NAME}.{sym}_{tf}"
+        for sym in SYMBOLS
+    ))
+    for tf in TIMEFRAMES
+}
+
+def get_fronttest_latest_ts(conn, timeframe):
+    """
+    Newest timestamp (UTC) of fronttest.<symbol>_<timeframe> for every symbol.
+    Return {symbol: datetime or None}.
+    """
+    with conn.begin():
+        rows = conn.execute(LATEST_TS_SQL[timeframe]).fetchall()
+    latest = {}
+    for row in rows:
+        max_ts = row.max_ts
+        if max_ts:
+            if not max_ts.tzinfo:
+                max_ts = max_ts.replace(tzinfo=timezone.utc)
+            else:
+                max_ts = max_ts.astimezone(timezone.utc)
+        latest[row.symbol] = max_ts
+    return latest
+
+def probe_fronttest_latest_ts(timeframe):
+    """get_fronttest_latest_ts on a pooled connection of its own (safe to call from worker threads)."""
+    with engine.connect() as conn:
+        return get_fronttest_latest_ts(conn, timeframe)
 
 ##############################################################################
 # 5) CHECK IF FRONTTEST TABLE IS UP TO DATE
 ##############################################################################
-def is_up_to_date(symbol, timeframe):
+def is_up_to_date(yf_candle, db_ts):
     """
-    Compare newest fronttest candle vs. newest yfinance candle
+    Compare newest fronttest candle (db_ts, from get_fronttest_latest_ts)
+    vs. newest yfinance candle (from fetch_latest_yf_candles)
     with ~90-second tolerance.
     Return (db_ts_str, bool).
     """
-    yf_candle = fetch_latest_yf_candle(symbol, timeframe)
     if not yf_candle:
         return ("NO YF DATA", False)
 
-    db_ts = get_fronttest_latest_ts(symbol, timeframe)
     if not db_ts:
         return ("NO FRONTTEST DATA", False)
 
@@ -158,65 +216,165 @@ def is_up_to_date(symbol, timeframe):
 ##############################################################################
 # 6) FETCH FULL YFINANCE HISTORY (PERIOD=MAX)
 ##############################################################################
+def cache_delta_period(newest_cached_ts, yf_interval):
+    """
+    Smallest yfinance period reaching back past the newest cached bar (with a
+    day of margin) that Yahoo accepts for yf_interval; "max" otherwise.
+    """
+    gap_days = (pd.Timestamp.now(tz=timezone.utc) - newest_cached_ts).total_seconds() / 86400
+    max_days = YF_INTERVAL_MAX_DAYS.get(yf_interval)
+    for period, span_days in YF_DELTA_PERIODS:
+        if max_days is not None and span_days > max_days:
+            break
+        if gap_days + 1 <= span_days:
+            return period
+    return "max"
+
+def fetch_yf_history_utc(ticker, period, yf_interval):
+    """ticker.history() with the index converted to UTC (may be empty)."""
+    hist = ticker.history(period=period, interval=yf_interval)
+    if not hist.empty:
+        if hist.index.tz is None:
+            hist.index = hist.index.tz_localize(timezone.utc)
+        else:
+            hist.index = hist.index.tz_convert(timezone.utc)
+    return hist
+
+def has_new_corporate_action(hist, newest_cached_ts):
+    """True if any bar of hist newer than newest_cached_ts has a dividend or split."""
+    new_bars = hist[hist.index > newest_cached_ts]
+    return any(
+        col in new_bars.columns and (new_bars[col].fillna(0) != 0).any()
+        for col in ("Dividends", "Stock Splits")
+    )
+
 def fetch_full_yf_history(symbol, timeframe):
     """
-    Returns a list of dicts: 
-      {timestamp, open, high, low, close, volume, candle_color}
+    Returns a DataFrame with columns
+      timestamp, open, high, low, close, volume, candle_color
+    (empty on error / no data).
+
+    The raw yfinance history is cached in CACHE_DIR; when a cache file exists
+    only the delta since its newest bar is downloaded and merged in, instead
+    of period='max' every time.
     """
-    import yfinance as yf
     yf_symbol = YFINANCE_SYMBOLS[symbol]
     yf_interval = map_tf_to_yf_interval(timeframe)
 
+    cache_path = os.path.join(CACHE_DIR, f"{symbol}_{timeframe}.parquet")
+    cached = None
+    period = "max"
+    if USE_PARQUET_CACHE and os.path.exists(cache_path):
+        try:
+            cached = pd.read_parquet(cache_path)
+        except Exception as e:
+            # e.g. a truncated file from an interrupted run => treat as no cache
+            print(f"  [WARNING] Could not read {cache_path} ({e}), fetching period='max'.")
+            cached = None
+    if cached is not None:
+        # Only keep bars inside Yahoo's current window for this interval (what
+        # period='max' would return today): older bars are never served again, and
+        # carrying them would grow every run's COPY/merge without bound and keep
+        # overwriting DB rows that yfinance no longer covers.
+        max_days = YF_INTERVAL_MAX_DAYS.get(yf_interval)
+        if max_days is not None:
+            cutoff = pd.Timestamp.now(tz=timezone.utc) - pd.Timedelta(days=max_days)
+            cached = cached[cached.index >= cutoff]
+        if cached.empty:
+            cached = None
+    if cached is not None:
+        period = cache_delta_period(cached.index.max(), yf_interval)
+        print(f"  [INFO] Using cached {cache_path}, fetching period='{period}' from yfinance.")
+
     ticker = yf.Ticker(yf_symbol)
     try:
-        hist = ticker.history(period="max", interval=yf_interval)
+        hist = fetch_yf_history_utc(ticker, period, yf_interval)
     except Exception as e:
         print(f"[ERROR] fetch_full_yf_history: {symbol} {timeframe} => {e}")
-        return []
+        return pd.DataFrame(columns=CANDLE_COLUMNS)
 
     if hist.empty:
-        return []
-
-    if hist.index.tz is None:
-        hist.index = hist.index.tz_localize(timezone.utc)
+        if cached is None:
+            return pd.DataFrame(columns=CANDLE_COLUMNS)
+        # Nothing downloaded => use the cache as-is and leave the file untouched
+        hist = cached
     else:
-        hist.index = hist.index.tz_convert(timezone.utc)
+        if cached is not None and hist.index.min() > cached.index.max():
+            # The download doesn't reach back to the newest cached bar => there is a
+            # hole between them. Don't prepend the older cached bars, so main()'s
+            # deadzone check (oldest yfinance bar vs. DB) sees the real gap.
+            print(f"  [INFO] yfinance data starts after the end of {cache_path}, dropping the cache.")
+            cached = None
+
+        if cached is not None and has_new_corporate_action(hist, cached.index.max()):
+            # history() prices are dividend/split adjusted: a new action re-bases every
+            # older bar, so the cached bars are stale => drop the cache, refetch 'max'
+            print(f"  [INFO] Dividend/split since {cache_path} was written, refetching period='max'.")
+            cached = None
+            try:
+                hist = fetch_yf_history_utc(ticker, "max", yf_interval)
+            except Exception as e:
+                print(f"[ERROR] fetch_full_yf_history: {symbol} {timeframe} => {e}")
+                return pd.DataFrame(columns=CANDLE_COLUMNS)
+            if hist.empty:
+                return pd.DataFrame(columns=CANDLE_COLUMNS)
+
+        if cached is not None:
+            # Newly downloaded bars win over cached ones (the last cached bar may have been partial)
+            hist = pd.concat([cached, hist])
+            hist = hist[~hist.index.duplicated(keep="last")].sort_index()
+        if USE_PARQUET_CACHE:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            hist.to_parquet(cache_path, compression="zstd")
+
+    idx = hist.index
+    # Adjust daily (same as adjust_daily_timestamp, for the whole index)
+    if timeframe == "1d":
+        daily_offset = pd.Timedelta(hours=14, minutes=30) if symbol == "spy" else pd.Timedelta(0)
+        idx = idx.normalize() + daily_offset
+    # If eurusd & 5m => shift +5h if consistent
+    if symbol == "eurusd" and timeframe == "5m":
+        idx = idx + pd.Timedelta(hours=5)
 
-    rows = []
-    for dt, row in hist.iterrows():
-        # Adjust daily
-        if timeframe == "1d":
-            dt = adjust_daily_timestamp(symbol, dt)
-        # If eurusd & 5m => shift +5h if consistent
-        if symbol == "eurusd" and timeframe == "5m":
-            dt = dt + timedelta(hours=5)
-
-        o = float(row["Open"])
-        h = float(row["High"])
-        l = float(row["Low"])
-        c = float(row["Close"])
-        v = int(row["Volume"]) if not row.isna().Volume else 0
-
-        color = compute_candle_color(o, c)
-        rows.append({
-            "timestamp": dt,
-            "open": o,
-            "high": h,
-            "low":  l,
-            "close": c,
-            "volume": v,
-            "candle_color": color,
-        })
-    return rows
+    o = hist["Open"].to_numpy(dtype=float)
+    c = hist["Close"].to_numpy(dtype=float)
+
+    return pd.DataFrame({
+        "timestamp": idx,
+        "open": o,
+        "high": hist["High"].to_numpy(dtype=float),
+        "low":  hist["Low"].to_numpy(dtype=float),
+        "close": c,
+        "volume": hist["Volume"].fillna(0).astype("int64").to_numpy(),
+        "candle_color": compute_candle_colors(o, c),
+    })
 
 ##############################################################################
 # 7) UPSERT INTO fronttest.<symbol>_<timeframe> (INCLUDES CANDLE_COLOR)
 ##############################################################################
+STAGING_SQL = """
+CREATE TEMP TABLE stg (
+    symbol       text,
+    timestamp    timestamptz,
+    open         float8,
+    high         float8,
+    low          float8,
+    close        float8,
+    volume       bigint,
+    candle_color text
+) ON COMMIT DROP
+"""
+
+COPY_SQL = """
+COPY stg (symbol, timestamp, open, high, low, close, volume, candle_color)
+FROM STDIN WITH (FORMAT text)
+"""
+
 UPSERT_SQL = """
 INSERT INTO {table_name}
     (symbol, timestamp, open, high, low, close, volume, candle_color)
-VALUES
-    (:symbol, :ts, :o, :h, :l, :c, :v, :cc)
+SELECT symbol, timestamp, open, high, low, close, volume, candle_color
+  FROM stg
 ON CONFLICT (symbol, timestamp) DO UPDATE
     SET open         = EXCLUDED.open,
         high         = EXCLUDED.high,
@@ -226,86 +384,95 @@ ON CONFLICT (symbol, timestamp) DO UPDATE
         candle_color = EXCLUDED.candle_color
 """
 
-def upsert_rows(symbol, timeframe, candles):
+UPSERT_SQL_BY_TABLE = {
+    (sym, tf): UPSERT_SQL.format(table_name=f"{SCHEMA_NAME}.{sym}_{tf}")
+    for sym in SYMBOLS for tf in TIMEFRAMES
+}
+
+# NULL marker in COPY text format
+COPY_NULL = "\\N"
+
+def upsert_frame(conn, symbol, timeframe, df):
     """
-    Upsert each candle (which must have candle_color).
+    Upsert a candle DataFrame (CANDLE_COLUMNS, which must include candle_color):
+    pandas' C CSV writer builds a COPY text payload for a temp staging table,
+    then one INSERT ... SELECT ... ON CONFLICT into fronttest.
     Returns how many inserted/updated.
     """
-    table_name = f"{SCHEMA_NAME}.{symbol}_{timeframe}"
-    sql_str = UPSERT_SQL.format(table_name=table_name)
-    count = 0
-    with engine.begin() as conn:
-        for c in candles:
-            conn.execute(text(sql_str), {
-                "symbol": symbol,
-                "ts":     c["timestamp"],
-                "o":      c["open"],
-                "h":      c["high"],
-                "l":      c["low"],
-                "c":      c["close"],
-                "v":      c["volume"],
-                "cc":     c["candle_color"],
-            })
-            count += 1
+    # Last candle per timestamp wins; a repeated key would abort the ON CONFLICT merge
+    df = df.drop_duplicates(subset="timestamp", keep="last")
+    out = df.assign(symbol=symbol)[["symbol"] + CANDLE_COLUMNS]
+    # NaN prices (yfinance gaps) go in as float8 'NaN', as the per-row upsert stored
+    # them, not as NULL (a NOT NULL column would abort the whole merge); only a
+    # missing volume (nullable public.* data) is sent as NULL.
+    if out["volume"].isna().any():
+        out = out.assign(volume=out["volume"].astype(object).where(out["volume"].notna(), COPY_NULL))
+    buf = io.StringIO()
+    out.to_csv(buf, sep="\t", header=False, index=False, na_rep="NaN")
+    buf.seek(0)
+
+    with conn.begin():
+        cur = conn.connection.cursor()
+        cur.execute(STAGING_SQL)
+        cur.copy_expert(COPY_SQL, buf)
+        cur.execute(UPSERT_SQL_BY_TABLE[(symbol, timeframe)])
+        count = cur.rowcount
+        cur.close()
     return count
 
 ##############################################################################
 # 8) CHECK PUBLIC SCHEMA FOR 1m DEADZONE FILL
 ##############################################################################
-def fetch_public_1m_data(symbol, start_ts, end_ts):
-    """
-    Query public.<symbol>_1m for a range, also compute candle_color.
-    Return list of {timestamp, open, high, low, close, volume, candle_color}.
-    """
-    table_name = f"public.{symbol}_1m"
-    sql = text(f"""
+PUBLIC_1M_SQL = {
+    sym: text(f"""
         SELECT timestamp, open, high, low, close, volume
-          FROM {table_name}
+          FROM public.{sym}_1m
          WHERE timestamp >= :start_ts
            AND timestamp <= :end_ts
          ORDER BY timestamp ASC
     """)
+    for sym in SYMBOLS
+}
 
-    data = []
-    with engine.begin() as conn:
-        rows = conn.execute(sql, {"start_ts": start_ts, "end_ts": end_ts}).fetchall()
-
-    for r in rows:
-        ts_utc = r.timestamp
-        if not ts_utc.tzinfo:
-            ts_utc = ts_utc.replace(tzinfo=timezone.utc)
-        o = r.open
-        c = r.close
-        color = compute_candle_color(o, c)
-
-        data.append({
-            "timestamp": ts_utc,
-            "open": o,
-            "high": r.high,
-            "low":  r.low,
-            "close": c,
-            "volume": r.volume,
-            "candle_color": color,
-        })
-    return data
+def fetch_public_1m_data(conn, symbol, start_ts, end_ts):
+    """
+    Query public.<symbol>_1m for a range straight into a DataFrame
+    (CANDLE_COLUMNS, timestamps in UTC), also compute candle_color.
+    """
+    with conn.begin():
+        df = pd.read_sql(PUBLIC_1M_SQL[symbol], conn,
+                         params={"start_ts": start_ts, "end_ts": end_ts},
+                         parse_dates={"timestamp": {"utc": True}})
+    if df.empty:
+        return df
+
+    # public.* volumes may be numeric/float; the bigint column wants integers (NULLs kept)
+    df["volume"] = df["volume"].round().astype("Int64")
+    df["candle_color"] = compute_candle_colors(df["open"].to_numpy(dtype=float),
+                                               df["close"].to_numpy(dtype=float))
+    return df
 
 ##############################################################################
 # 9) FETCH LATEST FRONTTEST CANDLE (DETAILS)
 ##############################################################################
-def fetch_fronttest_candle(symbol, timeframe, ts):
+FRONTTEST_CANDLE_SQL = {
+    (sym, tf): text(f"""
+        SELECT open, high, low, close, volume, candle_color
+          FROM {SCHEMA_NAME}.{sym}_{tf}
+         WHERE timestamp = :ts
+         LIMIT 1
+    """)
+    for sym in SYMBOLS for tf in TIMEFRAMES
+}
+
+def fetch_fronttest_candle(conn, symbol, timeframe, ts):
     """
     Get open, close, high, low, volume, candle_color
     from fronttest.<symbol>_<timeframe> at a given timestamp.
     Return dict or None if not found.
     """
-    table_name = f"{SCHEMA_NAME}.{symbol}_{timeframe}"
-    sql = text(f"""
-        SELECT open, high, low, close, volume, candle_color
-          FROM {table_name}
-         WHERE timestamp = :ts
-         LIMIT 1
-    """)
-    with engine.begin() as conn:
+    sql = FRONTTEST_CANDLE_SQL[(symbol, timeframe)]
+    with conn.begin():
         row = conn.execute(sql, {"ts": ts}).fetchone()
     if not row:
         return None
@@ -327,9 +494,20 @@ def main():
     results = []
     out_of_date_list = []
 
+    # The DB probes run on a thread pool while the yfinance downloads (one
+    # batched download per timeframe) run here. yf.download is already threaded
+    # internally and keeps module-level state, so it isn't called concurrently.
+    with ThreadPoolExecutor(max_workers=STATUS_CHECK_WORKERS) as ex:
+        db_ts_futures = {tf: ex.submit(probe_fronttest_latest_ts, tf) for tf in TIMEFRAMES}
+        yf_candles = {tf: fetch_latest_yf_candles(tf) for tf in TIMEFRAMES}
+        db_latest = {tf: fut.result() for tf, fut in db_ts_futures.items()}
+
+    # Newest fronttest timestamp per table, reused by the update pass below
+    latest_ts = {(sym, tf): db_latest[tf].get(sym) for sym in SYMBOLS for tf in TIMEFRAMES}
+
     for sym in SYMBOLS:
         for tf in TIMEFRAMES:
-            db_ts_str, up_to_date = is_up_to_date(sym, tf)
+            db_ts_str, up_to_date = is_up_to_date(yf_candles[tf].get(sym), latest_ts[(sym, tf)])
             table_name = f"{sym}_{tf}"
             status_icon = "✅" if up_to_date else "❌"
             results.append((table_name, db_ts_str, status_icon))
@@ -352,88 +530,88 @@ def main():
         return
 
     print()
-    # 3) For each out-of-date symbol/timeframe, ask user if they'd like to update
-    for sym, tf in out_of_date_list:
-        # CHANGED HERE: Always answer "yes"
-        ans = "yes"
-        print(f"Update fronttest.{sym}_{tf}? (yes/no): {ans}")
-        # if the script used to do something with ans not in ("yes", "y"), we just mimic acceptance:
-        if ans not in ("yes", "y"):
-            print(f"Skipping {sym}_{tf}.")
-            continue
-
-        # 3a) Fetch yfinance full data
-        print(f"[INFO] Fetching period='max' from yfinance for {sym}_{tf}...")
-        yf_rows = fetch_full_yf_history(sym, tf)
-        if not yf_rows:
-            print(f"[WARNING] No data fetched from yfinance for {sym}_{tf}. Skipping.")
-            continue
-        yf_rows.sort(key=lambda x: x["timestamp"])
-        oldest_yf_dt = yf_rows[0]["timestamp"]
-        newest_yf_dt = yf_rows[-1]["timestamp"]
-
-        # 3b) Check the existing fronttest latest candle for mismatch
-        db_latest_ts = get_fronttest_latest_ts(sym, tf)
-        if db_latest_ts:
-            match_yf = next((r for r in yf_rows if r["timestamp"] == db_latest_ts), None)
-            if match_yf:
-                db_candle = fetch_fronttest_candle(sym, tf, db_latest_ts)
-                if db_candle:
-                    threshold = CANDLE_MATCH_THRESHOLDS.get(sym, 0.01)
-                    open_ok = is_close_enough(db_candle["open"], match_yf["open"], threshold)
-                    close_ok = is_close_enough(db_candle["close"], match_yf["close"], threshold)
-                    if open_ok and close_ok:
-                        print(f"[INFO] For {sym}_{tf} at {db_latest_ts}, fronttest & yfinance match within {threshold}.")
-                    else:
-                        print(f"[WARNING] For {sym}_{tf} at {db_latest_ts}, mismatch between fronttest & yfinance.")
-                        print(f"  fronttest => open={db_candle['open']}, close={db_candle['close']}")
-                        print(f"  yfinance  => open={match_yf['open']}, close={match_yf['close']}")
-                        # CHANGED HERE: Always pick "2"
-                        choice = "2"
-                        print(f"Which candle do you want to keep? (1=fronttest, 2=yfinance): {choice}")
-                        if choice == "1":
-                            match_yf["open"]   = db_candle["open"]
-                            match_yf["close"]  = db_candle["close"]
-                            match_yf["high"]   = db_candle["high"]
-                            match_yf["low"]    = db_candle["low"]
-                            match_yf["volume"] = db_candle["volume"]
-                            match_yf["candle_color"] = db_candle["candle_color"]
-                            print("  [INFO] Overwrote yfinance row in memory with fronttest data.")
+    # One connection for the whole update pass (each helper runs its own
+    # transaction on it) instead of a pool checkout per helper call.
+    with engine.connect() as conn:
+        # 3) For each out-of-date symbol/timeframe, ask user if they'd like to update
+        for sym, tf in out_of_date_list:
+            # CHANGED HERE: Always answer "yes"
+            ans = "yes"
+            print(f"Update fronttest.{sym}_{tf}? (yes/no): {ans}")
+            # if the script used to do something with ans not in ("yes", "y"), we just mimic acceptance:
+            if ans not in ("yes", "y"):
+                print(f"Skipping {sym}_{tf}.")
+                continue
+
+            # 3a) Fetch yfinance full data
+            print(f"[INFO] Fetching full yfinance history for {sym}_{tf}...")
+            yf_df = fetch_full_yf_history(sym, tf)
+            if yf_df.empty:
+                print(f"[WARNING] No data fetched from yfinance for {sym}_{tf}. Skipping.")
+                continue
+            yf_df = yf_df.sort_values("timestamp", ignore_index=True)
+            oldest_yf_dt = yf_df["timestamp"].iloc[0].to_pydatetime()
+            newest_yf_dt = yf_df["timestamp"].iloc[-1].to_pydatetime()
+
+            # 3b) Check the existing fronttest latest candle for mismatch
+            db_latest_ts = latest_ts[(sym, tf)]
+            if db_latest_ts:
+                match_mask = yf_df["timestamp"] == db_latest_ts
+                if match_mask.any():
+                    match_yf = yf_df[match_mask].iloc[0]
+                    db_candle = fetch_fronttest_candle(conn, sym, tf, db_latest_ts)
+                    if db_candle:
+                        threshold = CANDLE_MATCH_THRESHOLDS.get(sym, 0.01)
+                        open_ok = is_close_enough(db_candle["open"], match_yf["open"], threshold)
+                        close_ok = is_close_enough(db_candle["close"], match_yf["close"], threshold)
+                        if open_ok and close_ok:
+                            print(f"[INFO] For {sym}_{tf} at {db_latest_ts}, fronttest & yfinance match within {threshold}.")
                         else:
-                            print("  [INFO] Kept yfinance candle. fronttest will be overwritten upon upsert.")
-
-            if oldest_yf_dt > db_latest_ts:
-                print(f"[WARNING] Deadzone detected for fronttest.{sym}_{tf}!")
-                print(f"  The newest fronttest candle is {db_latest_ts},")
-                print(f"  but yfinance's oldest candle is {oldest_yf_dt} => GAP in between.")
-
-                if tf == "1m":
-                    # CHANGED HERE: Always pick "yes"
-                    ans_pub = "yes"
-                    print(f"Check public schema for missing 1m data? (yes/no): {ans_pub}")
-                    if ans_pub in ("yes","y"):
-                        gap_start = db_latest_ts + timedelta(seconds=1)
-                        gap_end   = oldest_yf_dt - timedelta(seconds=1)
-                        if gap_end <= gap_start:
-                            print("  [INFO] The gap is zero or negative range. Skipping public fill.")
-                        else:
-                            public_data = fetch_public_1m_data(sym, gap_start, gap_end)
-                            if public_data:
-                                print(f"  [INFO] Found {len(public_data)} 1m candles in public.{sym}_1m covering the gap.")
-                                inserted_count = upsert_rows(sym, tf, public_data)
-                                print(f"  [INFO] Inserted/updated {inserted_count} from public => fronttest.")
+                            print(f"[WARNING] For {sym}_{tf} at {db_latest_ts}, mismatch between fronttest & yfinance.")
+                            print(f"  fronttest => open={db_candle['open']}, close={db_candle['close']}")
+                            print(f"  yfinance  => open={match_yf['open']}, close={match_yf['close']}")
+                            # CHANGED HERE: Always pick "2"
+                            choice = "2"
+                            print(f"Which candle do you want to keep? (1=fronttest, 2=yfinance): {choice}")
+                            if choice == "1":
+                                keep_cols = ["open", "close", "high", "low", "volume", "candle_color"]
+                                yf_df.loc[match_mask, keep_cols] = [db_candle[col] for col in keep_cols]
+                                print("  [INFO] Overwrote yfinance row in memory with fronttest data.")
+                            else:
+                                print("  [INFO] Kept yfinance candle. fronttest will be overwritten upon upsert.")
+
+                if oldest_yf_dt > db_latest_ts:
+                    print(f"[WARNING] Deadzone detected for fronttest.{sym}_{tf}!")
+                    print(f"  The newest fronttest candle is {db_latest_ts},")
+                    print(f"  but yfinance's oldest candle is {oldest_yf_dt} => GAP in between.")
+
+                    if tf == "1m":
+                        # CHANGED HERE: Always pick "yes"
+                        ans_pub = "yes"
+                        print(f"Check public schema for missing 1m data? (yes/no): {ans_pub}")
+                        if ans_pub in ("yes","y"):
+                            gap_start = db_latest_ts + timedelta(seconds=1)
+                            gap_end   = oldest_yf_dt - timedelta(seconds=1)
+                            if gap_end <= gap_start:
+                                print("  [INFO] The gap is zero or negative range. Skipping public fill.")
                             else:
-                                print(f"  [INFO] No data found in public.{sym}_1m for that gap.")
-                else:
-                    print("  [INFO] Non-1m timeframe deadzone => no automatic fill from public schema.")
+                                public_df = fetch_public_1m_data(conn, sym, gap_start, gap_end)
+                                if not public_df.empty:
+                                    print(f"  [INFO] Found {len(public_df)} 1m candles in public.{sym}_1m covering the gap.")
+                                    inserted_count = upsert_frame(conn, sym, tf, public_df)
+                                    print(f"  [INFO] Inserted/updated {inserted_count} from public => fronttest.")
+                                else:
+                                    print(f"  [INFO] No data found in public.{sym}_1m for that gap.")
+                    else:
+                        print("  [INFO] Non-1m timeframe deadzone => no automatic fill from public schema.")
 
-        else:
-            print(f"[DEBUG] fronttest.{sym}_{tf} is empty. No deadzone check needed.")
+            else:
+                print(f"[DEBUG] fronttest.{sym}_{tf} is empty. No deadzone check needed.")
 
-        # 3c) Upsert final YF data into fronttest
-        inserted = upsert_rows(sym, tf, yf_rows)
-        print(f"[INFO] Inserted/updated {inserted} candles from yfinance into fronttest.{sym}_{tf} "
-              f"(range: {oldest_yf_dt} -> {newest_yf_dt}).")
+            # 3c) Upsert final YF data into fronttest
+            inserted = upsert_frame(conn, sym, tf, yf_df)
+            print(f"[INFO] Inserted/updated {inserted} candles from yfinance into fronttest.{sym}_{tf} "
+                  f"(range: {oldest_yf_dt} -> {newest_yf_dt}).")
 
     print("\n[INFO] Done checking/updating fronttest tables.\n")
 